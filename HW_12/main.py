@@ -1,12 +1,24 @@
 from fastapi import Depends, FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.openapi.utils import get_openapi
+from fastapi.responses import ORJSONResponse
+from slowapi import _rate_limit_exceeded_handler
+from slowapi.errors import RateLimitExceeded
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.db import get_db
 from src.routes import auth, contacts
+from src.services.auth import JWTAuthMiddleware, auth_service
+from src.services.limiter import limiter
 
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
+app.state.limiter = limiter
+app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+CONTACTS_PREFIX = "/api/contacts"
+
+# authenticates and rate-limits /api/contacts once per request
+app.add_middleware(JWTAuthMiddleware, prefix=CONTACTS_PREFIX)
 
 origins = ["*"]
 
@@ -22,6 +34,27 @@ app.include_router(auth.router, prefix="/api")
 app.include_router(contacts.router, prefix="/api")
 
 
+def openapi():
+    # contacts routes authenticate in JWTAuthMiddleware, not through a security
+    # dependency, so declare the OAuth2 scheme on them here for the docs
+    if app.openapi_schema:
+        return app.openapi_schema
+    schema = get_openapi(title=app.title, version=app.version, routes=app.routes)
+    schemes = schema.setdefault("components", {}).setdefault("securitySchemes", {})
+    schemes["OAuth2PasswordBearer"] = auth_service.oauth2_scheme.model.model_dump(
+        mode="json", by_alias=True, exclude_none=True
+    )
+    for path, operations in schema["paths"].items():
+        if path.startswith(CONTACTS_PREFIX):
+            for operation in operations.values():
+                operation["security"] = [{"OAuth2PasswordBearer": []}]
+    app.openapi_schema = schema
+    return schema
+
+
+app.openapi = openapi
+
+
 @app.get("/api/healthchecker")
 async def healthchecker(db: AsyncSession = Depends(get_db)):
     try:
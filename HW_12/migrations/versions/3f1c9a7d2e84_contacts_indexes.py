@@ -0,0 +1,35 @@
+"""contacts indexes
+
+Revision ID: 3f1c9a7d2e84
+Revises: 50a043fa3058
+Create Date: 2026-10-14 10:12:41.518203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c9a7d2e84'
+down_revision: Union[str, None] = '50a043fa3058'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_contacts_user_id_id', 'contacts', ['user_id', 'id'])
+    op.create_index(
+        'ix_contacts_user_id_birthday_mmdd',
+        'contacts',
+        [
+            'user_id',
+            sa.text('(EXTRACT(month FROM birthday) * 100 + EXTRACT(day FROM birthday))'),
+        ],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_contacts_user_id_birthday_mmdd', table_name='contacts')
+    op.drop_index('ix_contacts_user_id_id', table_name='contacts')
@@ -0,0 +1,37 @@
+"""contacts trgm search
+
+Revision ID: 8b27e5d4c0a1
+Revises: 3f1c9a7d2e84
+Create Date: 2026-10-14 11:03:17.204955
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b27e5d4c0a1'
+down_revision: Union[str, None] = '3f1c9a7d2e84'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = ('first_name', 'last_name', 'email')
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for column in COLUMNS:
+        op.create_index(
+            f'ix_contacts_{column}_trgm',
+            'contacts',
+            [column],
+            postgresql_using='gin',
+            postgresql_ops={column: 'gin_trgm_ops'},
+        )
+
+
+def downgrade() -> None:
+    for column in COLUMNS:
+        op.drop_index(f'ix_contacts_{column}_trgm', table_name='contacts')
@@ -0,0 +1,42 @@
+"""users email covering index
+
+Revision ID: c4e8a61f9b35
+Revises: 8b27e5d4c0a1
+Create Date: 2026-10-14 14:27:52.880417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e8a61f9b35'
+down_revision: Union[str, None] = '8b27e5d4c0a1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_users_email_covering',
+        'users',
+        ['email'],
+        unique=True,
+        postgresql_include=[
+            'id',
+            'username',
+            'password',
+            'refresh_token',
+            'created_at',
+            'updated_at',
+        ],
+    )
+    # the covering index now enforces uniqueness on its own
+    op.drop_constraint('users_email_key', 'users', type_='unique')
+
+
+def downgrade() -> None:
+    op.create_unique_constraint('users_email_key', 'users', ['email'])
+    op.drop_index('ix_users_email_covering', table_name='users')
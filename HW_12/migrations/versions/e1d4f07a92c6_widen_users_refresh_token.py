@@ -0,0 +1,34 @@
+"""widen users refresh_token
+
+Revision ID: e1d4f07a92c6
+Revises: c4e8a61f9b35
+Create Date: 2026-10-14 16:05:33.417920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1d4f07a92c6'
+down_revision: Union[str, None] = 'c4e8a61f9b35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # widening a varchar is metadata-only in postgres, so the
+    # ix_users_email_covering index that INCLUDEs this column stays valid
+    op.alter_column('users', 'refresh_token',
+               existing_type=sa.String(length=255),
+               type_=sa.String(length=512),
+               existing_nullable=True)
+
+
+def downgrade() -> None:
+    op.alter_column('users', 'refresh_token',
+               existing_type=sa.String(length=512),
+               type_=sa.String(length=255),
+               existing_nullable=True)
@@ -1,6 +1,17 @@
 from datetime import date, datetime
 
-from sqlalchemy import Date, DateTime, ForeignKey, Integer, String, func
+from sqlalchemy import (
+    Date,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    extract,
+    func,
+    literal_column,
+)
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 
@@ -22,18 +33,69 @@ class Contact(Base):
         DateTime, default=func.now(), onupdate=func.now()
     )
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"))
-    user: Mapped["User"] = relationship(
-        "User", back_populates="contacts", lazy="joined"
-    )
+    user: Mapped["User"] = relationship("User", back_populates="contacts", lazy="raise")
+
+    @hybrid_property
+    def birthday_mmdd(self) -> int:
+        return self.birthday.month * 100 + self.birthday.day
+
+    @birthday_mmdd.inplace.expression
+    @classmethod
+    def _birthday_mmdd_expression(cls):
+        # literal 100 so the SQL matches the index expression exactly
+        return extract("month", cls.birthday) * literal_column("100") + extract(
+            "day", cls.birthday
+        )
+
+
+Index("ix_contacts_user_id_id", Contact.user_id, Contact.id)
+Index("ix_contacts_user_id_birthday_mmdd", Contact.user_id, Contact.birthday_mmdd)
+# trigram indexes for the ILIKE '%term%' search, requires the pg_trgm extension
+Index(
+    "ix_contacts_first_name_trgm",
+    Contact.first_name,
+    postgresql_using="gin",
+    postgresql_ops={"first_name": "gin_trgm_ops"},
+)
+Index(
+    "ix_contacts_last_name_trgm",
+    Contact.last_name,
+    postgresql_using="gin",
+    postgresql_ops={"last_name": "gin_trgm_ops"},
+)
+Index(
+    "ix_contacts_email_trgm",
+    Contact.email,
+    postgresql_using="gin",
+    postgresql_ops={"email": "gin_trgm_ops"},
+)
 
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # the only index on email: enforces uniqueness and lets
+        # get_user_by_email run as an index-only scan
+        Index(
+            "ix_users_email_covering",
+            "email",
+            unique=True,
+            postgresql_include=[
+                "id",
+                "username",
+                "password",
+                "refresh_token",
+                "created_at",
+                "updated_at",
+            ],
+        ),
+    )
     id: Mapped[int] = mapped_column(primary_key=True)
     username: Mapped[str] = mapped_column(String(50), nullable=False)
-    email: Mapped[str] = mapped_column(String(150), nullable=False, unique=True)
+    email: Mapped[str] = mapped_column(String(150), nullable=False)
     password: Mapped[str] = mapped_column(String(255), nullable=False)
-    refresh_token: Mapped[str] = mapped_column(String(255), nullable=True)
+    # EdDSA refresh tokens reach ~415 chars for a 150-char email
+    refresh_token: Mapped[str] = mapped_column(String(512), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now())
     updated_at: Mapped[datetime] = mapped_column(
         DateTime, default=func.now(), onupdate=func.now()
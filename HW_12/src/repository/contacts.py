@@ -1,21 +1,47 @@
 from datetime import date, timedelta
 from typing import Optional
 
-from sqlalchemy import and_, extract, or_, select
+from sqlalchemy import StatementLambdaElement, func, lambda_stmt, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.entity.models import Contact, User
 from src.schemas.contact import ContactSchema, ContactUpdateSchema
 
 
+def _contact_stmt(contact_id: int, user_id: int) -> StatementLambdaElement:
+    return lambda_stmt(
+        lambda: select(Contact).where(
+            Contact.id == contact_id, Contact.user_id == user_id
+        )
+    )
+
+
 async def get_contacts(limit: int, offset: int, db: AsyncSession, user: User):
-    stmt = select(Contact).filter_by(user_id=user.id).offset(offset).limit(limit)
+    user_id = user.id
+    stmt = lambda_stmt(
+        lambda: select(Contact)
+        .where(Contact.user_id == user_id)
+        .order_by(Contact.id)
+        .offset(offset)
+        .limit(limit)
+    )
     contacts = await db.execute(stmt)
     return contacts.scalars().all()
 
 
+async def get_contacts_version(db: AsyncSession, user: User):
+    user_id = user.id
+    stmt = lambda_stmt(
+        lambda: select(func.max(Contact.updated_at), func.count()).where(
+            Contact.user_id == user_id
+        )
+    )
+    result = await db.execute(stmt)
+    return result.one()
+
+
 async def get_contact(contact_id: int, db: AsyncSession, user: User):
-    stmt = select(Contact).filter_by(id=contact_id, user_id=user.id)
+    stmt = _contact_stmt(contact_id, user.id)
     contact = await db.execute(stmt)
     return contact.scalar_one_or_none()
 
@@ -31,7 +57,7 @@ async def create_contact(body: ContactSchema, db: AsyncSession, user: User):
 async def update_contact(
     contact_id: int, body: ContactUpdateSchema, db: AsyncSession, user: User
 ):
-    stmt = select(Contact).filter_by(id=contact_id, user_id=user.id)
+    stmt = _contact_stmt(contact_id, user.id)
     result = await db.execute(stmt)
     contact = result.scalar_one_or_none()
     if contact:
@@ -47,7 +73,7 @@ async def update_contact(
 
 
 async def delete_contact(contact_id: int, db: AsyncSession, user: User):
-    stmt = select(Contact).filter_by(id=contact_id, user_id=user.id)
+    stmt = _contact_stmt(contact_id, user.id)
     result = await db.execute(stmt)
     contact = result.scalar_one_or_none()
 
@@ -87,19 +113,25 @@ async def get_birthdays(db: AsyncSession, user: User):
     today = date.today()
     upcoming_date = today + timedelta(days=7)
 
-    query = select(Contact).filter(
-        Contact.user_id == user.id,
-        or_(
-            and_(
-                extract("month", Contact.birthday) == today.month,
-                extract("day", Contact.birthday) >= today.day,
-            ),
-            and_(
-                extract("month", Contact.birthday) == upcoming_date.month,
-                extract("day", Contact.birthday) <= upcoming_date.day,
-            ),
-        ),
-    )
+    start = today.month * 100 + today.day
+    end = upcoming_date.month * 100 + upcoming_date.day
+
+    user_id = user.id
+
+    if start <= end:
+        query = lambda_stmt(
+            lambda: select(Contact).where(
+                Contact.user_id == user_id, Contact.birthday_mmdd.between(start, end)
+            )
+        )
+    else:
+        # the week wraps around new year
+        query = lambda_stmt(
+            lambda: select(Contact).where(
+                Contact.user_id == user_id,
+                or_(Contact.birthday_mmdd >= start, Contact.birthday_mmdd <= end),
+            )
+        )
 
     result = await db.execute(query)
     return result.scalars().all()
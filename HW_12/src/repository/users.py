@@ -28,3 +28,10 @@ async def update_token(
     if token is not None:
         user.refresh_token = token
         await db.commit()
+
+
+async def update_password(
+    user: User, password: str, db: AsyncSession = Depends(get_db)
+):
+    user.password = password
+    await db.commit()
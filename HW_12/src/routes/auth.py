@@ -1,5 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import (
+    HTTPAuthorizationCredentials,
     HTTPBearer,
     OAuth2PasswordRequestForm,
 )
@@ -9,6 +10,7 @@ from src.database.db import get_db
 from src.repository import users as repositories_users
 from src.schemas.user import TokenSchema, UserResponse, UserSchema
 from src.services.auth import auth_service
+from src.services.limiter import limiter
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 get_refresh_token = HTTPBearer()
@@ -17,26 +19,38 @@ get_refresh_token = HTTPBearer()
 @router.post(
     "/signup", response_model=UserResponse, status_code=status.HTTP_201_CREATED
 )
-async def signup(body: UserSchema, db: AsyncSession = Depends(get_db)):
+@limiter.limit("5/minute")
+async def signup(
+    request: Request, body: UserSchema, db: AsyncSession = Depends(get_db)
+):
     exist_user = await repositories_users.get_user_by_email(body.email, db)
     if exist_user:
         raise HTTPException(status_code=409, detail="Account already exists")
-    body.password = auth_service.get_password_hash(body.password)
+    body.password = await auth_service.get_password_hash(body.password)
     new_user = await repositories_users.create_user(body, db)
     return new_user
 
 
 @router.post("/login", response_model=TokenSchema)
+@limiter.limit("5/minute")
 async def login(
-    body: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)
+    request: Request,
+    body: OAuth2PasswordRequestForm = Depends(),
+    db: AsyncSession = Depends(get_db),
 ):
     user = await repositories_users.get_user_by_email(body.username, db)
     if user is None:
         raise HTTPException(status_code=401, detail="Invalid email or password")
-    if not auth_service.verify_password(body.password, user.password):
+    verified, new_hash = await auth_service.verify_password(
+        body.password, user.password
+    )
+    if not verified:
         raise HTTPException(status_code=401, detail="Invalid email or password")
-    access_token = await auth_service.create_access_token(data={"sub": user.email})
-    refresh_token = await auth_service.create_refresh_token(data={"sub": user.email})
+    if new_hash is not None:
+        await repositories_users.update_password(user, new_hash, db)
+        auth_service.invalidate(user.email)
+    access_token = auth_service.create_access_token(data={"sub": user.email})
+    refresh_token = auth_service.create_refresh_token(data={"sub": user.email})
     await repositories_users.update_token(user, refresh_token, db)
     return {
         "access_token": access_token,
@@ -46,15 +60,19 @@ async def login(
 
 
 @router.get("/refresh_token", response_model=TokenSchema)
+@limiter.limit("10/minute")
 async def refresh_token(
-    db: AsyncSession = Depends(get_db), token: str = Depends(get_refresh_token)
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    credentials: HTTPAuthorizationCredentials = Depends(get_refresh_token),
 ):
-    email = await auth_service.decode_refresh_token(token)
+    token = credentials.credentials
+    email = auth_service.decode_refresh_token(token)
     user = await repositories_users.get_user_by_email(email, db)
-    if user.refresh_token != token:
+    if user is None or user.refresh_token != token:
         raise HTTPException(status_code=401, detail="Invalid refresh token")
-    access_token = await auth_service.create_access_token(data={"sub": email})
-    refresh_token = await auth_service.create_refresh_token(data={"sub": email})
+    access_token = auth_service.create_access_token(data={"sub": email})
+    refresh_token = auth_service.create_refresh_token(data={"sub": email})
     await repositories_users.update_token(user, refresh_token, db)
     return {
         "access_token": access_token,
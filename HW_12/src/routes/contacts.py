@@ -1,33 +1,63 @@
+from datetime import datetime
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Path, Query, status
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Path,
+    Query,
+    Request,
+    Response,
+    status,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.db import get_db
 from src.entity.models import User
 from src.repository import contacts as repositories_contacts
 from src.schemas.contact import ContactResponse, ContactSchema, ContactUpdateSchema
-from src.services.auth import auth_service
+from src.services.auth import current_user
 
 router = APIRouter(prefix="/contacts", tags=["contacts"])
 
+CACHE_CONTROL = "private, no-cache"
+
+
+def _stamp(value: datetime | None) -> int:
+    return int(value.timestamp() * 1_000_000) if value else 0
+
+
+def _not_modified(request: Request, response: Response, etag: str) -> bool:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    return request.headers.get("if-none-match") == etag
+
 
 @router.get("/", response_model=List[ContactResponse])
 async def get_contacts(
+    request: Request,
+    response: Response,
     limit: int = Query(default=10, ge=10, le=500),
     offset: int = Query(default=0, ge=0),
     db: AsyncSession = Depends(get_db),
-    user: User = Depends(auth_service.get_current_user),
+    user: User = Depends(current_user),
 ) -> List[ContactResponse]:
+    updated_at, count = await repositories_contacts.get_contacts_version(db, user)
+    etag = f'W/"{user.id}-{limit}-{offset}-{count}-{_stamp(updated_at)}"'
+    if _not_modified(request, response, etag):
+        return Response(status_code=304, headers=response.headers)
     contacts = await repositories_contacts.get_contacts(limit, offset, db, user)
     return contacts
 
 
 @router.get("/{contact_id}", response_model=ContactResponse)
 async def get_contact(
+    request: Request,
+    response: Response,
     contact_id: int = Path(ge=1),
     db: AsyncSession = Depends(get_db),
-    user: User = Depends(auth_service.get_current_user),
+    user: User = Depends(current_user),
 ) -> ContactResponse:
     contact = await repositories_contacts.get_contact(contact_id, db, user)
     if contact is None:
@@ -35,6 +65,9 @@ async def get_contact(
             status_code=404,
             detail=f"Contact with id {contact_id} not found",
         )
+    etag = f'W/"{contact.id}-{_stamp(contact.updated_at)}"'
+    if _not_modified(request, response, etag):
+        return Response(status_code=304, headers=response.headers)
     return contact
 
 
@@ -42,7 +75,7 @@ async def get_contact(
 async def create_contact(
     body: ContactSchema,
     db: AsyncSession = Depends(get_db),
-    user: User = Depends(auth_service.get_current_user),
+    user: User = Depends(current_user),
 ) -> ContactResponse:
     contact = await repositories_contacts.create_contact(body, db, user)
     return contact
@@ -53,7 +86,7 @@ async def update_contact(
     body: ContactUpdateSchema,
     contact_id: int = Path(ge=1),
     db: AsyncSession = Depends(get_db),
-    user: User = Depends(auth_service.get_current_user),
+    user: User = Depends(current_user),
 ) -> ContactResponse:
     contact = await repositories_contacts.update_contact(contact_id, body, db, user)
     if contact is None:
@@ -68,7 +101,7 @@ async def update_contact(
 async def delete_contact(
     contact_id: int = Path(ge=1),
     db: AsyncSession = Depends(get_db),
-    user: User = Depends(auth_service.get_current_user),
+    user: User = Depends(current_user),
 ) -> ContactResponse:
     contact = await repositories_contacts.delete_contact(contact_id, db, user)
     if contact is None:
@@ -85,7 +118,7 @@ async def search_contacts(
     last_name: Optional[str] = None,
     email: Optional[str] = None,
     db: AsyncSession = Depends(get_db),
-    user: User = Depends(auth_service.get_current_user),
+    user: User = Depends(current_user),
 ) -> List[ContactResponse]:
     contacts = await repositories_contacts.search_contacts(
         first_name, last_name, email, db, user
@@ -96,7 +129,7 @@ async def search_contacts(
 @router.get("/birthdays/", response_model=List[ContactResponse])
 async def get_birthdays(
     db: AsyncSession = Depends(get_db),
-    user: User = Depends(auth_service.get_current_user),
+    user: User = Depends(current_user),
 ) -> List[ContactResponse]:
     contacts = await repositories_contacts.get_birthdays(db, user)
     return contacts
@@ -1,7 +1,7 @@
 from datetime import date
 from typing import Optional
 
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 
 
 class ContactSchema(BaseModel):
@@ -22,8 +22,15 @@ class ContactUpdateSchema(BaseModel):
     additional_info: Optional[str] = Field(None, max_length=255)
 
 
-class ContactResponse(ContactSchema):
+class ContactResponse(BaseModel):
+    # plain types: rows coming from the db are already validated, so skip
+    # the per-row EmailStr check and length constraints of ContactSchema
     id: int
+    first_name: str
+    last_name: str
+    email: Optional[str] = None
+    phone_number: str
+    birthday: Optional[date] = None
+    additional_info: Optional[str] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
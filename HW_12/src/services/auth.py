@@ -1,99 +1,241 @@
-from datetime import datetime, timedelta
+import asyncio
+import hashlib
+import itertools
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
 from typing import Optional
 
-from fastapi import Depends, HTTPException
+import jwt
+from fastapi import HTTPException, Request
+from fastapi.responses import ORJSONResponse
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
+from fastapi.security.utils import get_authorization_scheme_param
+from slowapi.util import get_remote_address
 from passlib.context import CryptContext
 from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from src.conf.config import hashing
-from src.database.db import get_db
+from src.database.db import sessionmanager
+from src.entity.models import User
 from src.repository import users as repositories_users
+from src.services.limiter import (
+    AUTH_FAILURE_LIMIT,
+    CONTACTS_LIMIT,
+    limiter,
+    too_many_requests,
+)
+
+_PWD_CTX = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    deprecated="auto",
+    argon2__memory_cost=19456,
+    argon2__time_cost=2,
+    argon2__parallelism=1,
+)
+_SECRET = hashing.PRIVATE_KEY
+_PUBLIC = hashing.PUBLIC_KEY
+_ALG = hashing.ALGORITHM
+_BEARER_HEADERS = {"WWW-Authenticate": "Bearer"}
+
+# password hashing is CPU-bound; keep it off the event loop
+_pwd_pool = ThreadPoolExecutor(max_workers=os.cpu_count())
+
+if hashing.PRIVATE_KEY is None or hashing.PUBLIC_KEY is None:
+    raise RuntimeError(
+        "Set JWT_PRIVATE_KEY and JWT_PUBLIC_KEY (or JWT_*_KEY_FILE) to Ed25519 PEM keys"
+    )
+
+
+def _evict(cache: dict, size: int) -> None:
+    # dicts keep insertion order, so the front holds the oldest entries;
+    # drop a tenth at once so a full cache is not trimmed on every miss
+    for key in list(itertools.islice(cache, max(1, size // 10))):
+        del cache[key]
+
+
+def _credentials_exception() -> HTTPException:
+    # a fresh instance per raise so tracebacks do not pile up on a shared one
+    return HTTPException(
+        status_code=401,
+        detail="Could not validate credentials",
+        headers=_BEARER_HEADERS,
+    )
 
 
 class Auth:
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-    SECRET_KEY = hashing.KEY
-    ALGORITHM = hashing.ALGORITHM
+    TOKEN_CACHE_SIZE = 10_000
+    USER_CACHE_SIZE = 10_000
+    USER_CACHE_TTL = 60
 
-    def verify_password(self, plain_password: str, hashed_password: str) -> bool:
-        return self.pwd_context.verify(plain_password, hashed_password)
+    def __init__(self):
+        # digest of the raw token -> (decoded payload, exp timestamp)
+        self._token_cache: dict[bytes, tuple[dict, float]] = {}
+        # email -> (id, username, email, expires_at)
+        self._user_cache: dict[str, tuple[int, str, str, float]] = {}
 
-    def get_password_hash(self, password: str) -> str:
-        return self.pwd_context.hash(password)
+    def invalidate(self, email: str) -> None:
+        self._user_cache.pop(email, None)
+
+    async def verify_password(
+        self, plain_password: str, hashed_password: str
+    ) -> tuple[bool, str | None]:
+        return await asyncio.get_running_loop().run_in_executor(
+            _pwd_pool, _PWD_CTX.verify_and_update, plain_password, hashed_password
+        )
+
+    async def get_password_hash(self, password: str) -> str:
+        return await asyncio.get_running_loop().run_in_executor(
+            _pwd_pool, _PWD_CTX.hash, password
+        )
 
     oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
 
-    async def create_access_token(
+    def create_access_token(
         self, data: dict, expires_delta: Optional[timedelta] = None
     ) -> str:
         to_encode = data.copy()
-        expire = datetime.utcnow() + (
-            expires_delta if expires_delta else timedelta(minutes=15)
-        )
-        to_encode.update(
-            {"iat": datetime.utcnow(), "exp": expire, "scope": "access_token"}
-        )
-        encoded_access_token = jwt.encode(
-            to_encode, self.SECRET_KEY, algorithm=self.ALGORITHM
+        now = int(time.time())
+        expire = now + int(
+            (expires_delta if expires_delta else timedelta(minutes=15)).total_seconds()
         )
+        to_encode.update({"iat": now, "exp": expire, "scope": "access_token"})
+        encoded_access_token = jwt.encode(to_encode, _SECRET, algorithm=_ALG)
         return encoded_access_token
 
-    async def create_refresh_token(
+    def create_refresh_token(
         self, data: dict, expires_delta: Optional[timedelta] = None
     ) -> str:
         to_encode = data.copy()
-        expire = datetime.utcnow() + (
-            expires_delta if expires_delta else timedelta(days=15)
-        )
-        to_encode.update(
-            {"iat": datetime.utcnow(), "exp": expire, "scope": "refresh_token"}
-        )
-        encoded_refresh_token = jwt.encode(
-            to_encode, self.SECRET_KEY, algorithm=self.ALGORITHM
+        now = int(time.time())
+        expire = now + int(
+            (expires_delta if expires_delta else timedelta(days=15)).total_seconds()
         )
+        to_encode.update({"iat": now, "exp": expire, "scope": "refresh_token"})
+        encoded_refresh_token = jwt.encode(to_encode, _SECRET, algorithm=_ALG)
         return encoded_refresh_token
 
-    async def decode_refresh_token(self, refresh_token: str) -> str:
-        try:
-            payload = jwt.decode(
-                refresh_token, self.SECRET_KEY, algorithms=[self.ALGORITHM]
-            )
-            if payload.get("scope") == "refresh_token":
-                email = payload.get("sub")
-                if email is None:
-                    raise HTTPException(status_code=401, detail="Invalid token payload")
-                return email
-            raise HTTPException(status_code=401, detail="Invalid scope for token")
-        except JWTError:
-            raise HTTPException(
-                status_code=401, detail="Could not validate credentials"
-            )
+    def _decode_token(self, token: str) -> dict:
+        key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+        cached = self._token_cache.get(key)
+        now = time.time()
+        if cached is not None:
+            payload, exp = cached
+            if exp > now:
+                return payload
+            del self._token_cache[key]
 
-    async def get_current_user(
-        self, token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)
-    ):
-        credentials_exception = HTTPException(
-            status_code=401,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        payload = jwt.decode(token, _PUBLIC, algorithms=[_ALG])
+        exp = payload.get("exp")
+        if exp is not None:
+            if len(self._token_cache) >= self.TOKEN_CACHE_SIZE:
+                _evict(self._token_cache, self.TOKEN_CACHE_SIZE)
+            self._token_cache[key] = (payload, exp)
+        return payload
+
+    def _decode(self, token: str, expected_scope: str) -> str:
         try:
-            payload = jwt.decode(token, self.SECRET_KEY, algorithms=[self.ALGORITHM])
-            if payload.get("scope") == "access_token":
-                email = payload.get("sub")
-                if email is None:
-                    raise credentials_exception
-            else:
-                raise credentials_exception
-        except JWTError:
-            raise credentials_exception
+            payload = self._decode_token(token)
+        except jwt.InvalidTokenError:
+            raise _credentials_exception()
+        email = payload.get("sub")
+        if payload.get("scope") != expected_scope or email is None:
+            raise _credentials_exception()
+        return email
+
+    def decode_access_token(self, access_token: str) -> str:
+        return self._decode(access_token, "access_token")
+
+    def decode_refresh_token(self, refresh_token: str) -> str:
+        return self._decode(refresh_token, "refresh_token")
 
+    def get_cached_user(self, email: str) -> User | None:
+        cached = self._user_cache.get(email)
+        if cached is not None:
+            if cached[3] > time.time():
+                # transient snapshot, not attached to the session
+                return User(id=cached[0], username=cached[1], email=cached[2])
+            del self._user_cache[email]
+        return None
+
+    async def load_user(self, email: str, db: AsyncSession) -> User | None:
         user = await repositories_users.get_user_by_email(email, db)
         if user is None:
-            raise credentials_exception
+            return None
+        if len(self._user_cache) >= self.USER_CACHE_SIZE:
+            _evict(self._user_cache, self.USER_CACHE_SIZE)
+        self._user_cache[email] = (
+            user.id,
+            user.username,
+            user.email,
+            time.time() + self.USER_CACHE_TTL,
+        )
         return user
 
 
 auth_service = Auth()
+
+
+# authenticates requests under prefix once and stores the user on
+# request.state.user; rate limits and 401s are answered before the route
+class JWTAuthMiddleware:
+    def __init__(self, app: ASGIApp, prefix: str = "/api/contacts"):
+        self.app = app
+        self.prefix = prefix
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] == "OPTIONS"
+            or not scope["path"].startswith(self.prefix)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        authorization = request.headers.get("authorization")
+        scheme, token = get_authorization_scheme_param(authorization)
+        try:
+            if not token or scheme.lower() != "bearer":
+                raise HTTPException(
+                    status_code=401,
+                    detail="Not authenticated",
+                    headers=_BEARER_HEADERS,
+                )
+            email = auth_service.decode_access_token(token)
+            user = auth_service.get_cached_user(email)
+            if user is None:
+                async with sessionmanager.session() as db:
+                    user = await auth_service.load_user(email, db)
+            if user is None:
+                raise _credentials_exception()
+        except HTTPException as exc:
+            # only rejected credentials count, so valid tokens from the same
+            # address never share this bucket
+            address = get_remote_address(request)
+            if not limiter.limiter.hit(AUTH_FAILURE_LIMIT, "auth-failures", address):
+                await too_many_requests(AUTH_FAILURE_LIMIT)(scope, receive, send)
+                return
+            response = ORJSONResponse(
+                {"detail": exc.detail},
+                status_code=exc.status_code,
+                headers=exc.headers,
+            )
+            await response(scope, receive, send)
+            return
+
+        if not limiter.limiter.hit(CONTACTS_LIMIT, "contacts", str(user.id)):
+            await too_many_requests(CONTACTS_LIMIT)(scope, receive, send)
+            return
+
+        scope.setdefault("state", {})["user"] = user
+        await self.app(scope, receive, send)
+
+
+async def current_user(request: Request) -> User:
+    user = getattr(request.state, "user", None)
+    if user is None:
+        raise _credentials_exception()
+    return user
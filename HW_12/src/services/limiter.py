@@ -0,0 +1,18 @@
+from fastapi.responses import ORJSONResponse
+from limits import RateLimitItem, parse
+from slowapi import Limiter
+from slowapi.util import get_remote_address
+
+from src.conf.config import config
+
+limiter = Limiter(key_func=get_remote_address, storage_uri=config.RATE_LIMIT_STORAGE)
+
+# enforced by JWTAuthMiddleware: rejected credentials per client address
+# and requests per authenticated user
+AUTH_FAILURE_LIMIT = parse("20/minute")
+CONTACTS_LIMIT = parse("60/minute")
+
+
+def too_many_requests(limit: RateLimitItem) -> ORJSONResponse:
+    # same body as slowapi's _rate_limit_exceeded_handler
+    return ORJSONResponse({"error": f"Rate limit exceeded: {limit}"}, status_code=429)